@@ -2,31 +2,37 @@ import torch
 import argparse
 import numpy as np
 import os
+from server_optimizer import SERVER_OPTIMIZERS, load_server_state, save_server_state, server_update
+from layout_plan import plan_signature, fed_avg, weighted_fed_avg, fed_median, trimmed_mean, norm_clipping, krum, krum_index
+from model_store import put_model, put_file, record_round
 
-def krum(models, num_neighbors=2):
+STRATEGIES = {
+    "fedavg": ("FedAvg", fed_avg),
+    "weighted_fedavg": ("Weighted FedAvg", weighted_fed_avg),
+    "median": ("FedMedian", fed_median),
+    "trimmed_mean": ("Trimmed Mean", trimmed_mean),
+    "norm_clipping": ("Norm Clipping", norm_clipping),
+    "krum": ("Krum", krum),
+}
+
+def aggregate(models, strategy, client_sizes=None):
     """
-    Aggregates models using Krum, a robust aggregation technique.
+    Aggregates models with the given strategy. All strategies share the cached
+    layout plan of the architecture and build the aggregate in one flat buffer.
     Args:
         models: List of model state_dicts from clients.
-        num_neighbors: Number of closest neighbors to consider (default is 2).
+        strategy: Key of STRATEGIES.
+        client_sizes: List of dataset sizes for each client (weighted_fedavg only).
     Returns:
-        krum_model: The selected Krum model.
+        The aggregated global model.
     """
-    distances = []
-
-    # Calculate distances between models
-    for i, model_i in enumerate(models):
-        dists = []
-        for j, model_j in enumerate(models):
-            if i != j:
-                dist = sum([(model_i[key] - model_j[key]).norm().item() for key in model_i])
-                dists.append(dist)
-        dists.sort()
-        distances.append((i, sum(dists[:num_neighbors])))
-
-    # Select the model with the smallest sum of distances to its closest neighbors
-    selected_model_index = sorted(distances, key=lambda x: x[1])[0][0]
-    return models[selected_model_index]
+    if strategy == "krum":
+        return krum(models, num_neighbors=2)
+    if strategy == "weighted_fedavg":
+        if client_sizes is None or len(client_sizes) != len(models):
+            raise ValueError("weighted_fedavg requires one client size per model")
+        return weighted_fed_avg(models, client_sizes)
+    return STRATEGIES[strategy][1](models)
 
 def load_models(model_paths):
     """
@@ -38,6 +44,23 @@ def load_models(model_paths):
     """
     return [torch.load(model_path) for model_path in model_paths]
 
+def read_client_samples(metrics_files):
+    """
+    Reads the number of samples each client actually trained on from its client_metrics.txt.
+    Args:
+        metrics_files: List of client metrics file paths, in the same order as the models.
+    Returns:
+        List of sample counts.
+    """
+    samples = []
+    for metrics_file in metrics_files:
+        with open(metrics_file) as f:
+            values = dict(line.split(":", 1) for line in f if ":" in line)
+        if "Samples" not in values:
+            raise ValueError(f"No sample count recorded in {metrics_file}")
+        samples.append(int(values["Samples"].strip()))
+    return samples
+
 def save_model(model, path):
     """
     Saves the model state_dict to the given path.
@@ -47,25 +70,61 @@ def save_model(model, path):
     """
     torch.save(model, path)
 
-def main(trained_model_files, global_model):
+def main(trained_model_files, global_model, strategy="krum", client_sizes=None, client_metrics=None, server_optimizer="none", server_lr=None, server_state=None, store_dir=None, round_number=None):
     # Load models from client files
     models = load_models(trained_model_files)
 
-    # Perform Krum aggregation
-    krum_model = krum(models, num_neighbors=2)
+    # Weight by the work each client actually did when no explicit sizes are given
+    if client_sizes is None and client_metrics:
+        client_sizes = read_client_samples(client_metrics)
+
+    # Perform the aggregation
+    if strategy == "krum":
+        selected_index = krum_index(models, num_neighbors=2)
+        aggregated_model = models[selected_index]
+    else:
+        aggregated_model = aggregate(models, strategy, client_sizes)
+
+    # Apply the server optimizer step on top of the base strategy
+    if server_optimizer != "none":
+        global_state_dict = torch.load(global_model, map_location=torch.device('cpu'))
+        state = load_server_state(server_state, server_optimizer, plan_signature(global_state_dict))
+        aggregated_model, state = server_update(global_state_dict, aggregated_model, server_optimizer, state, server_lr)
+        save_server_state(state, "server_optimizer_state.pt")
 
     # Save the aggregated model
-    save_model(krum_model, "updated_global_model.pth")
+    save_model(aggregated_model, "updated_global_model.pth")
 
     # Log the aggregation strategy
     with open("aggregation_log.txt", "w") as f:
-        f.write("Aggregation Strategy: Krum\n")
-        f.write("Selected Krum Model Index: " + str(models.index(krum_model)) + "\n")
+        f.write("Aggregation Strategy: " + STRATEGIES[strategy][0] + "\n")
+        if strategy == "krum":
+            f.write("Selected Krum Model Index: " + str(selected_index) + "\n")
+        if server_optimizer != "none":
+            f.write("Server Optimizer: " + server_optimizer + " (step " + str(state["step"]) + ")\n")
+
+    # Checkpoint the round in the model store so an interrupted run can resume from here
+    if store_dir:
+        client_digests = [put_model(model, store_dir) for model in models]
+        global_digest = put_model(aggregated_model, store_dir)
+        server_state_digest = put_file("server_optimizer_state.pt", store_dir) if server_optimizer != "none" else None
+        record_round(store_dir, round_number, global_digest, client_digests, server_state_digest)
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--models", nargs='+', required=True, help="List of trained models from clients")
     parser.add_argument("--global_model", type=str, required=True, help="Path to global model")
+    parser.add_argument("--strategy", type=str, default="krum", choices=list(STRATEGIES), help="Aggregation strategy")
+    parser.add_argument("--server_optimizer", type=str, default="none", choices=SERVER_OPTIMIZERS, help="Server optimizer applied to (aggregate - global)")
+    parser.add_argument("--server_lr", type=float, default=None, help="Server learning rate (default depends on the server optimizer)")
+    parser.add_argument("--server_state", type=str, default=None, help="Server optimizer state from the previous round")
+    parser.add_argument("--client_sizes", nargs='+', type=int, default=None, help="Dataset size of each client (weighted_fedavg)")
+    parser.add_argument("--client_metrics", nargs='+', default=None, help="Client metrics files; their sample counts are used as client sizes")
+    parser.add_argument("--store_dir", type=str, default=None, help="Model store directory used for round checkpointing")
+    parser.add_argument("--round_number", type=int, default=None, help="Round counter of the current round (required with --store_dir)")
     args = parser.parse_args()
 
-    main(args.models, args.global_model)
+    if args.store_dir and args.round_number is None:
+        parser.error("--round_number is required when --store_dir is given")
+
+    main(args.models, args.global_model, args.strategy, args.client_sizes, args.client_metrics, args.server_optimizer, args.server_lr, args.server_state, args.store_dir, args.round_number)
@@ -5,9 +5,10 @@ from torchvision import datasets, transforms, models
 from torch.utils.data import DataLoader
 import argparse
 import os
+import time
 from sklearn.metrics import precision_score, recall_score, f1_score
 
-def load_data(dataset_name="CIFAR10", batch_size=64, shuffle=True, train=True, custom_data_dir=None):
+def load_data(dataset_name="CIFAR10", batch_size=64, shuffle=True, train=True, custom_data_dir=None, num_workers=0):
     """
     Load a dataset based on the specified name. Supports CIFAR-10, CIFAR-100, MNIST, and custom datasets.
     Allows customization of batch size, shuffling, and whether to load the training or test set.
@@ -29,7 +30,7 @@ def load_data(dataset_name="CIFAR10", batch_size=64, shuffle=True, train=True, c
     else:
         raise ValueError(f"Unsupported dataset: {dataset_name}")
 
-    data_loader = DataLoader(dataset, batch_size=batch_size, shuffle=shuffle)
+    data_loader = DataLoader(dataset, batch_size=batch_size, shuffle=shuffle, num_workers=num_workers)
     return data_loader
 
 def compute_metrics(labels, predictions):
@@ -77,9 +78,103 @@ def train_mobilenet(data_loader, model, criterion, optimizer, epochs=1):
 
         print(f"Epoch [{epoch + 1}/{epochs}], Loss: {avg_loss:.4f}, Accuracy: {accuracy:.2f}%, Precision: {precision:.4f}, Recall: {recall:.4f}, F1 Score: {f1:.4f}")
         
-    return accuracy, avg_loss, precision, recall, f1
+    return accuracy, avg_loss, precision, recall, f1, epochs * len(data_loader), total
 
-def main(dataset, model_file, batch_size, shuffle, train, epochs, custom_data_dir):
+def train_with_budget(data_loader, model, criterion, optimizer, time_budget=None, max_steps=None,
+                      warmup_batches=5, patience=None, min_delta=1e-3):
+    """
+    Trains for a wall-clock time budget and/or a number of local steps instead of fixed epochs.
+    Throughput is measured over the first batches and used to pick the number of steps that fits
+    the deadline; the data loader is cycled if the budget allows more than one pass. Training can
+    optionally stop early when the smoothed loss has not improved by min_delta for patience steps.
+    Returns:
+        accuracy, avg_loss, precision, recall, f1, steps taken and samples seen.
+    """
+    if time_budget is None and max_steps is None:
+        raise ValueError("time_budget or max_steps is required")
+    if len(data_loader) == 0:
+        raise ValueError("Cannot train on an empty dataset")
+    if max_steps is not None and max_steps < 1:
+        raise ValueError("max_steps must be at least 1")
+    if time_budget is not None and time_budget <= 0:
+        raise ValueError("time_budget must be positive")
+    if warmup_batches < 1:
+        raise ValueError("warmup_batches must be at least 1")
+    if patience is not None and patience < 1:
+        raise ValueError("patience must be at least 1")
+
+    # Ensure the model is on the CPU
+    model = model.to('cpu')
+
+    correct = 0
+    total = 0
+    running_loss = 0.0
+    all_labels = []
+    all_preds = []
+
+    steps = 0
+    planned_steps = max_steps
+    smoothed_loss = None
+    best_loss = float('inf')
+    steps_since_improvement = 0
+    start_time = time.perf_counter()
+
+    while planned_steps is None or steps < planned_steps:
+        for inputs, labels in data_loader:
+            inputs, labels = inputs.to('cpu'), labels.to('cpu')
+
+            optimizer.zero_grad()
+            outputs = model(inputs)
+            loss = criterion(outputs, labels)
+            loss.backward()
+            optimizer.step()
+            steps += 1
+
+            # Accuracy calculation
+            _, predicted = torch.max(outputs.data, 1)
+            total += labels.size(0)
+            correct += (predicted == labels).sum().item()
+            running_loss += loss.item()
+
+            all_labels.extend(labels.numpy())
+            all_preds.extend(predicted.numpy())
+
+            # Fit the remaining steps to the deadline once throughput is known
+            if time_budget is not None and steps == warmup_batches:
+                elapsed = time.perf_counter() - start_time
+                budget_steps = steps + int(max(time_budget - elapsed, 0) / (elapsed / steps))
+                planned_steps = budget_steps if max_steps is None else min(max_steps, budget_steps)
+                print(f"Measured {elapsed / steps:.3f}s/step, planning {planned_steps} local steps for a {time_budget:.1f}s budget")
+
+            # Early stop on a loss plateau
+            if patience is not None:
+                smoothed_loss = loss.item() if smoothed_loss is None else 0.9 * smoothed_loss + 0.1 * loss.item()
+                if smoothed_loss < best_loss - min_delta:
+                    best_loss = smoothed_loss
+                    steps_since_improvement = 0
+                else:
+                    steps_since_improvement += 1
+                if steps_since_improvement >= patience:
+                    print(f"Loss plateaued after {steps} steps, stopping early")
+                    planned_steps = steps
+
+            # Never overrun the deadline, even if later steps are slower than the warmup ones
+            if time_budget is not None and time.perf_counter() - start_time >= time_budget:
+                planned_steps = steps
+
+            if planned_steps is not None and steps >= planned_steps:
+                break
+
+    accuracy = 100 * correct / total
+    precision, recall, f1 = compute_metrics(all_labels, all_preds)
+    avg_loss = running_loss / steps
+
+    print(f"Steps: {steps}, Samples: {total}, Time: {time.perf_counter() - start_time:.1f}s, Loss: {avg_loss:.4f}, Accuracy: {accuracy:.2f}%, Precision: {precision:.4f}, Recall: {recall:.4f}, F1 Score: {f1:.4f}")
+
+    return accuracy, avg_loss, precision, recall, f1, steps, total
+
+def main(dataset, model_file, batch_size, shuffle, train, epochs, custom_data_dir,
+         time_budget=None, max_steps=None, warmup_batches=5, patience=None):
     # Load a pre-trained global model (MobileNetV2) or from an external file
     model = models.mobilenet_v2(weights=None)  # Initialize MobileNetV2 without pre-trained weights
     if os.path.exists(model_file):
@@ -96,8 +191,13 @@ def main(dataset, model_file, batch_size, shuffle, train, epochs, custom_data_di
     criterion = nn.CrossEntropyLoss()
     optimizer = optim.SGD(model.parameters(), lr=0.01)
 
-    # Train locally on client data
-    accuracy, avg_loss, precision, recall, f1 = train_mobilenet(data_loader, model, criterion, optimizer, epochs=epochs)
+    # Train locally on client data, for a time/step budget if one is given
+    if time_budget is not None or max_steps is not None:
+        accuracy, avg_loss, precision, recall, f1, steps, samples = train_with_budget(
+            data_loader, model, criterion, optimizer, time_budget=time_budget, max_steps=max_steps,
+            warmup_batches=warmup_batches, patience=patience)
+    else:
+        accuracy, avg_loss, precision, recall, f1, steps, samples = train_mobilenet(data_loader, model, criterion, optimizer, epochs=epochs)
 
     # Save the locally trained model (on CPU)
     torch.save(model.state_dict(), "client_trained_model.pth")
@@ -109,6 +209,20 @@ def main(dataset, model_file, batch_size, shuffle, train, epochs, custom_data_di
         f.write(f"Precision: {precision:.4f}\n")
         f.write(f"Recall: {recall:.4f}\n")
         f.write(f"F1 Score: {f1:.4f}\n")
+        f.write(f"Steps: {steps}\n")
+        f.write(f"Samples: {samples}\n")
+
+def positive_int(value):
+    value = int(value)
+    if value < 1:
+        raise argparse.ArgumentTypeError("must be at least 1")
+    return value
+
+def positive_float(value):
+    value = float(value)
+    if value <= 0:
+        raise argparse.ArgumentTypeError("must be positive")
+    return value
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
@@ -119,6 +233,11 @@ if __name__ == "__main__":
     parser.add_argument("--train", type=bool, default=True, help="Load training or test set")
     parser.add_argument("--epochs", type=int, default=5, help="Number of training epochs")
     parser.add_argument("--custom_data_dir", type=str, default=None, help="Path to the custom dataset folder")
+    parser.add_argument("--time_budget", type=positive_float, default=None, help="Wall-clock training budget in seconds (overrides --epochs)")
+    parser.add_argument("--max_steps", type=positive_int, default=None, help="Maximum number of local steps (overrides --epochs)")
+    parser.add_argument("--warmup_batches", type=positive_int, default=5, help="Batches used to measure throughput for --time_budget")
+    parser.add_argument("--patience", type=positive_int, default=None, help="Stop early after this many steps without loss improvement")
     args = parser.parse_args()
 
-    main(args.dataset, args.model, args.batch_size, args.shuffle, args.train, args.epochs, args.custom_data_dir)
+    main(args.dataset, args.model, args.batch_size, args.shuffle, args.train, args.epochs, args.custom_data_dir,
+         args.time_budget, args.max_steps, args.warmup_batches, args.patience)
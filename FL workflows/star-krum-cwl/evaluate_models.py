@@ -0,0 +1,111 @@
+import torch
+import torch.nn as nn
+from torchvision import models
+import argparse
+import os
+from client_train import load_data, compute_metrics
+
+def load_state_dicts(model_paths):
+    """
+    Loads the model state_dicts to be scored onto the CPU.
+    Args:
+        model_paths: List of file paths for the models to evaluate.
+    Returns:
+        List of model state_dicts.
+    """
+    return [torch.load(model_path, map_location=torch.device('cpu')) for model_path in model_paths]
+
+def evaluate_models(data_loader, model, state_dicts, criterion):
+    """
+    Scores several state_dicts against the same data in a single pass.
+    Each batch is loaded once and every state_dict is swapped into the same
+    module to score it, so the dataset is decoded only once however many
+    candidates are compared.
+    Args:
+        data_loader: DataLoader over the held-out data.
+        model: Module with the architecture shared by all state_dicts.
+        state_dicts: List of model state_dicts to score.
+        criterion: Loss function.
+    Returns:
+        List of (accuracy, avg_loss, precision, recall, f1) tuples, one per state_dict.
+    """
+    model = model.to('cpu')
+    model.eval()
+
+    num_models = len(state_dicts)
+    correct = [0] * num_models
+    running_loss = [0.0] * num_models
+    all_preds = [[] for _ in range(num_models)]
+    all_labels = []
+    total = 0
+    num_batches = 0
+
+    with torch.inference_mode():
+        for inputs, labels in data_loader:
+            inputs, labels = inputs.to('cpu'), labels.to('cpu')
+
+            for idx, state_dict in enumerate(state_dicts):
+                # Swap the candidate weights into the shared module
+                model.load_state_dict(state_dict)
+                outputs = model(inputs)
+                running_loss[idx] += criterion(outputs, labels).item()
+
+                predicted = outputs.argmax(dim=1)
+                correct[idx] += (predicted == labels).sum().item()
+                all_preds[idx].append(predicted)
+
+            all_labels.append(labels)
+            total += labels.size(0)
+            num_batches += 1
+
+    labels_np = torch.cat(all_labels).numpy()
+    results = []
+    for idx in range(num_models):
+        accuracy = 100 * correct[idx] / total
+        avg_loss = running_loss[idx] / num_batches
+        precision, recall, f1 = compute_metrics(labels_np, torch.cat(all_preds[idx]).numpy())
+        results.append((accuracy, avg_loss, precision, recall, f1))
+
+    return results
+
+def main(dataset, model_files, batch_size, num_workers, custom_data_dir, output="evaluation_metrics.txt"):
+    # Load every candidate up front so the test set is streamed only once
+    missing = [model_file for model_file in model_files if not os.path.exists(model_file)]
+    if missing:
+        print(f"Model file(s) not found: {', '.join(missing)}")
+        return
+    state_dicts = load_state_dicts(model_files)
+
+    # One MobileNetV2 module is reused for every candidate
+    model = models.mobilenet_v2(weights=None)
+
+    # Stream the held-out test set once, in order, with large batches
+    data_loader = load_data(dataset_name=dataset, batch_size=batch_size, shuffle=False, train=False,
+                            custom_data_dir=custom_data_dir, num_workers=num_workers)
+
+    criterion = nn.CrossEntropyLoss()
+    results = evaluate_models(data_loader, model, state_dicts, criterion)
+
+    # Save the performance metrics in the same format as client_metrics.txt
+    with open(output, "w") as f:
+        for model_file, (accuracy, avg_loss, precision, recall, f1) in zip(model_files, results):
+            print(f"{model_file}: Loss: {avg_loss:.4f}, Accuracy: {accuracy:.2f}%, Precision: {precision:.4f}, Recall: {recall:.4f}, F1 Score: {f1:.4f}")
+            f.write(f"Model: {os.path.basename(model_file)}\n")
+            f.write(f"Accuracy: {accuracy:.2f}%\n")
+            f.write(f"Loss: {avg_loss:.4f}\n")
+            f.write(f"Precision: {precision:.4f}\n")
+            f.write(f"Recall: {recall:.4f}\n")
+            f.write(f"F1 Score: {f1:.4f}\n")
+            f.write("\n")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dataset", type=str, default="CIFAR10", help="Dataset to use: CIFAR10, CIFAR100, MNIST, or Custom")
+    parser.add_argument("--models", nargs='+', required=True, help="Model files to evaluate (e.g. global model and Krum candidates)")
+    parser.add_argument("--batch_size", type=int, default=512, help="Batch size for the data loader")
+    parser.add_argument("--num_workers", type=int, default=2, help="Number of data loading worker processes")
+    parser.add_argument("--custom_data_dir", type=str, default=None, help="Path to the custom dataset folder")
+    parser.add_argument("--output", type=str, default="evaluation_metrics.txt", help="Path of the metrics file")
+    args = parser.parse_args()
+
+    main(args.dataset, args.models, args.batch_size, args.num_workers, args.custom_data_dir, args.output)
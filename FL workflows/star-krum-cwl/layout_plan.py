@@ -0,0 +1,331 @@
+import torch
+
+# Kinds of state_dict entries, which decide how each entry is aggregated
+TRAINABLE = "trainable"
+BN_STAT = "bn_stat"
+COUNTER = "counter"
+
+BN_STAT_SUFFIXES = ("running_mean", "running_var")
+
+# Plans are cached in memory per architecture signature, so they are built once per process
+_PLAN_CACHE = {}
+
+class LayoutPlan:
+    """
+    Precomputed layout of a model state_dict.
+    Records key order, dtype, shape and kind of every entry, and the offsets of
+    the floating point entries in one contiguous flat buffer. The flat buffer uses
+    the widest float dtype of the model (at least float32), so no entry loses
+    precision. Integer counters (e.g. BatchNorm num_batches_tracked) are kept in a
+    separate int64 buffer so they are never touched by float arithmetic.
+    """
+
+    def __init__(self, state_dict, trainable_keys=None):
+        self.keys = list(state_dict.keys())
+        self.dtypes = {}
+        self.shapes = {}
+        self.kinds = {}
+        self.float_offsets = {}
+        self.counter_offsets = {}
+        self.float_dtype = torch.float32
+
+        float_numel = 0
+        counter_numel = 0
+        for key in self.keys:
+            tensor = state_dict[key]
+            numel = tensor.numel()
+            self.dtypes[key] = tensor.dtype
+            self.shapes[key] = tuple(tensor.shape)
+
+            if not tensor.is_floating_point():
+                self.kinds[key] = COUNTER
+                self.counter_offsets[key] = (counter_numel, counter_numel + numel)
+                counter_numel += numel
+                continue
+
+            if key.endswith(BN_STAT_SUFFIXES) or (trainable_keys is not None and key not in trainable_keys):
+                self.kinds[key] = BN_STAT
+            else:
+                self.kinds[key] = TRAINABLE
+            self.float_offsets[key] = (float_numel, float_numel + numel)
+            self.float_dtype = torch.promote_types(self.float_dtype, tensor.dtype)
+            float_numel += numel
+
+        self.float_numel = float_numel
+        self.counter_numel = counter_numel
+        self.float_keys = list(self.float_offsets.keys())
+        self.counter_keys = list(self.counter_offsets.keys())
+        self.trainable_mask = torch.zeros(float_numel, dtype=torch.bool)
+        for key in self.float_keys:
+            if self.kinds[key] == TRAINABLE:
+                start, end = self.float_offsets[key]
+                self.trainable_mask[start:end] = True
+
+    def views(self, float_buffer):
+        """
+        Splits a flat float buffer into per-entry views shaped like the state_dict entries.
+        Args:
+            float_buffer: 1-D float tensor of length float_numel.
+        Returns:
+            List of views, in float_keys order.
+        """
+        return [float_buffer[start:end].view(self.shapes[key]) for key, (start, end) in self.float_offsets.items()]
+
+    def float_tensors(self, state_dict):
+        """
+        Float entries of a state_dict, in float_keys order.
+        """
+        return [state_dict[key].detach() for key in self.float_keys]
+
+    def counters(self, state_dict):
+        """
+        Packs the integer counters of a state_dict into one int64 buffer.
+        """
+        if not self.counter_keys:
+            return torch.zeros(0, dtype=torch.int64)
+        return torch.cat([state_dict[key].detach().reshape(-1).to(torch.int64) for key in self.counter_keys])
+
+    def flatten(self, state_dict):
+        """
+        Packs a state_dict into flat buffers.
+        Args:
+            state_dict: Model state_dict matching this plan.
+        Returns:
+            (float_buffer, counter_buffer): float_dtype and int64 1-D tensors.
+        """
+        float_buffer = torch.empty(self.float_numel, dtype=self.float_dtype)
+        if self.float_keys:
+            torch.cat([tensor.reshape(-1) for tensor in self.float_tensors(state_dict)], out=float_buffer)
+        return float_buffer, self.counters(state_dict)
+
+    def stack(self, models):
+        """
+        Packs several state_dicts into one contiguous row per client.
+        Args:
+            models: List of model state_dicts from clients.
+        Returns:
+            (float_rows, counter_rows): tensors of shape [num_clients, numel].
+        """
+        float_rows = torch.empty(len(models), self.float_numel, dtype=self.float_dtype)
+        if self.float_keys:
+            for i, model in enumerate(models):
+                torch.cat([tensor.reshape(-1) for tensor in self.float_tensors(model)], out=float_rows[i])
+        return float_rows, self.stack_counters(models)
+
+    def stack_counters(self, models):
+        """
+        Packs the integer counters of several state_dicts into a [num_clients, counter_numel] tensor.
+        """
+        return torch.stack([self.counters(model) for model in models])
+
+    def weighted_sum(self, models, weights=None):
+        """
+        Sums the float entries of several state_dicts into one flat buffer.
+        Each client is added with one multi-tensor (foreach) call into per-entry
+        views of the buffer, so clients are never copied into flat rows.
+        Args:
+            models: List of model state_dicts from clients.
+            weights: Optional list of per-client weights (default 1).
+        Returns:
+            1-D float_dtype tensor of length float_numel.
+        """
+        total = torch.zeros(self.float_numel, dtype=self.float_dtype)
+        views = self.views(total)
+        for i, model in enumerate(models):
+            if weights is None:
+                torch._foreach_add_(views, self.float_tensors(model))
+            else:
+                torch._foreach_add_(views, self.float_tensors(model), alpha=weights[i])
+        return total
+
+    def sum_of_squares(self, models):
+        """
+        Sums the element-wise squares of the float entries of several state_dicts into one flat buffer.
+        """
+        total = torch.zeros(self.float_numel, dtype=self.float_dtype)
+        views = self.views(total)
+        for model in models:
+            tensors = self.float_tensors(model)
+            torch._foreach_addcmul_(views, tensors, tensors)
+        return total
+
+    def unflatten(self, float_buffer, counter_buffer):
+        """
+        Rebuilds a state_dict from flat buffers, restoring every entry's dtype and shape.
+        Args:
+            float_buffer: 1-D float tensor of length float_numel.
+            counter_buffer: 1-D int64 tensor of length counter_numel.
+        Returns:
+            Model state_dict with the original key order.
+        """
+        state_dict = {}
+        for key in self.keys:
+            if self.kinds[key] == COUNTER:
+                start, end = self.counter_offsets[key]
+                values = counter_buffer[start:end]
+            else:
+                start, end = self.float_offsets[key]
+                values = float_buffer[start:end]
+            state_dict[key] = values.reshape(self.shapes[key]).to(self.dtypes[key], copy=True)
+        return state_dict
+
+def plan_signature(state_dict):
+    """
+    Architecture signature of a state_dict: key order, dtypes and shapes.
+    """
+    return tuple((key, str(tensor.dtype), tuple(tensor.shape)) for key, tensor in state_dict.items())
+
+def get_layout_plan(state_dict, trainable_keys=None):
+    """
+    Returns the cached layout plan for the state_dict's architecture, building it on first use.
+    Args:
+        state_dict: Any model state_dict of the architecture.
+        trainable_keys: Optional set of parameter names (e.g. from model.named_parameters());
+            float entries outside it are treated as statistics. Defaults to a key-suffix heuristic.
+    Returns:
+        LayoutPlan for the architecture.
+    """
+    signature = (plan_signature(state_dict), tuple(sorted(trainable_keys)) if trainable_keys is not None else None)
+    plan = _PLAN_CACHE.get(signature)
+    if plan is None:
+        plan = LayoutPlan(state_dict, trainable_keys)
+        _PLAN_CACHE[signature] = plan
+    return plan
+
+def aggregate_counters(counter_rows):
+    """
+    Aggregates integer counters (e.g. num_batches_tracked) by taking the maximum over clients.
+    """
+    if counter_rows.shape[1] == 0:
+        return counter_rows.new_empty(0)
+    return counter_rows.max(dim=0).values
+
+def sort_rows(float_rows):
+    """
+    Sorts every column of the stacked client rows in place.
+    numpy sorts the short columns of a [num_clients, numel] array several times
+    faster than torch.sort(dim=0), and the in-place sort needs no second copy.
+    Args:
+        float_rows: Tensor of shape [num_clients, float_numel].
+    Returns:
+        float_rows, sorted along the client dimension.
+    """
+    float_rows.numpy().sort(axis=0)
+    return float_rows
+
+def fed_avg(models):
+    """
+    Aggregates models using Federated Averaging (FedAvg).
+    Args:
+        models: List of model state_dicts from clients.
+    Returns:
+        avg_model: The averaged global model.
+    """
+    plan = get_layout_plan(models[0])
+    total = plan.weighted_sum(models)
+    return plan.unflatten(total.div_(len(models)), aggregate_counters(plan.stack_counters(models)))
+
+def weighted_fed_avg(models, client_sizes):
+    """
+    Aggregates models using Weighted Federated Averaging.
+    Args:
+        models: List of model state_dicts from clients.
+        client_sizes: List of dataset sizes for each client.
+    Returns:
+        avg_model: The averaged global model.
+    """
+    plan = get_layout_plan(models[0])
+    total_size = sum(client_sizes)
+    weights = [size / total_size for size in client_sizes]
+    return plan.unflatten(plan.weighted_sum(models, weights), aggregate_counters(plan.stack_counters(models)))
+
+def fed_median(models):
+    """
+    Aggregates models using Federated Median (FedMedian).
+    Args:
+        models: List of model state_dicts from clients.
+    Returns:
+        median_model: The median global model.
+    """
+    plan = get_layout_plan(models[0])
+    float_rows, counter_rows = plan.stack(models)
+    sorted_rows = sort_rows(float_rows)
+    # Average the two middle values for an even number of clients, like np.median
+    middle = len(models) // 2
+    if len(models) % 2:
+        median = sorted_rows[middle]
+    else:
+        median = (sorted_rows[middle - 1] + sorted_rows[middle]) / 2
+    return plan.unflatten(median, aggregate_counters(counter_rows))
+
+def trimmed_mean(models, trim_percent=0.1):
+    """
+    Aggregates models using Trimmed Mean.
+    Args:
+        models: List of model state_dicts from clients.
+        trim_percent: Percentage of extreme values to trim from each side (default 10%).
+    Returns:
+        trimmed_mean_model: The trimmed mean global model.
+    """
+    plan = get_layout_plan(models[0])
+    trim_count = int(trim_percent * len(models))
+    if trim_count == 0:
+        return fed_avg(models)
+    float_rows, counter_rows = plan.stack(models)
+    trimmed_rows = sort_rows(float_rows)[trim_count:len(models) - trim_count]
+    return plan.unflatten(trimmed_rows.mean(dim=0), aggregate_counters(counter_rows))
+
+def norm_clipping(models, clip_threshold=1.0):
+    """
+    Aggregates models using Norm-based Clipping.
+    Args:
+        models: List of model state_dicts from clients.
+        clip_threshold: Clipping threshold for the norm.
+    Returns:
+        clipped_model: The clipped global model.
+    """
+    plan = get_layout_plan(models[0])
+    # The per-element norm over clients scales every client alike, so clipping the mean is enough
+    norms = plan.sum_of_squares(models).sqrt_()
+    scale = torch.clamp(clip_threshold / norms, max=1.0)
+    clipped = plan.weighted_sum(models).div_(len(models)).mul_(scale)
+    return plan.unflatten(clipped, aggregate_counters(plan.stack_counters(models)))
+
+def krum_index(models, num_neighbors=2):
+    """
+    Selects the Krum candidate: the model with the smallest sum of distances
+    to its closest neighbors, where the distance between two models is the sum
+    of the per-tensor norms of their difference. Integer counters are ignored.
+    Args:
+        models: List of model state_dicts from clients.
+        num_neighbors: Number of closest neighbors to consider (default is 2).
+    Returns:
+        Index of the selected model.
+    """
+    plan = get_layout_plan(models[0])
+    tensors = [plan.float_tensors(model) for model in models]
+    num_models = len(models)
+
+    # Each pair costs two multi-tensor calls (difference and per-tensor norms) instead of one per entry
+    distances = torch.zeros(num_models, num_models, dtype=torch.float64)
+    for i in range(num_models):
+        for j in range(i + 1, num_models):
+            norms = torch._foreach_norm(torch._foreach_sub(tensors[i], tensors[j]))
+            distances[i, j] = distances[j, i] = torch.stack(norms).double().sum()
+
+    scores = []
+    for i in range(num_models):
+        dists = torch.cat([distances[i, :i], distances[i, i + 1:]]).sort().values
+        scores.append(dists[:num_neighbors].sum().item())
+    return min(range(num_models), key=lambda i: scores[i])
+
+def krum(models, num_neighbors=2):
+    """
+    Aggregates models using Krum, a robust aggregation technique.
+    Args:
+        models: List of model state_dicts from clients.
+        num_neighbors: Number of closest neighbors to consider (default is 2).
+    Returns:
+        krum_model: The selected Krum model.
+    """
+    return models[krum_index(models, num_neighbors)]
@@ -0,0 +1,193 @@
+import torch
+import argparse
+import hashlib
+import json
+import os
+import shutil
+
+OBJECTS_DIR = "objects"
+MODELS_DIR = "models"
+ROUND_MANIFEST = "rounds.json"
+
+def tensor_digest(tensor):
+    """
+    Computes the content hash of a tensor (dtype, shape and raw bytes).
+    Args:
+        tensor: Tensor to hash.
+    Returns:
+        Hex SHA-256 digest of the tensor contents.
+    """
+    tensor = tensor.detach().cpu().contiguous()
+    h = hashlib.sha256()
+    h.update(str(tensor.dtype).encode())
+    h.update(str(tuple(tensor.shape)).encode())
+    h.update(tensor.reshape(-1).view(torch.uint8).numpy().tobytes())
+    return h.hexdigest()
+
+def _atomic_write(path, write_fn):
+    # Write to a temporary file first so a crash never leaves a partial object behind
+    tmp_path = path + ".tmp"
+    write_fn(tmp_path)
+    os.replace(tmp_path, path)
+
+def _write_text(path, text):
+    with open(path, "w") as f:
+        f.write(text)
+
+def put_model(state_dict, store_dir):
+    """
+    Adds a model state_dict to the store. Tensors already present in the store
+    (e.g. frozen layers unchanged since a previous round) are not written again.
+    Args:
+        state_dict: Model state_dict.
+        store_dir: Root directory of the model store.
+    Returns:
+        model_digest: Content hash identifying the stored model.
+    """
+    os.makedirs(os.path.join(store_dir, OBJECTS_DIR), exist_ok=True)
+    os.makedirs(os.path.join(store_dir, MODELS_DIR), exist_ok=True)
+
+    layout = []
+    for key, tensor in state_dict.items():
+        digest = tensor_digest(tensor)
+        object_path = os.path.join(store_dir, OBJECTS_DIR, digest + ".pt")
+        if not os.path.exists(object_path):
+            _atomic_write(object_path, lambda p, t=tensor: torch.save(t.detach().cpu().clone(), p))
+        layout.append([key, digest])
+
+    layout_json = json.dumps(layout)
+    model_digest = hashlib.sha256(layout_json.encode()).hexdigest()
+    model_path = os.path.join(store_dir, MODELS_DIR, model_digest + ".json")
+    if not os.path.exists(model_path):
+        _atomic_write(model_path, lambda p: _write_text(p, layout_json))
+    return model_digest
+
+def put_file(path, store_dir):
+    """
+    Adds an opaque file (e.g. the server optimizer state) to the store.
+    Args:
+        path: Path of the file to add.
+        store_dir: Root directory of the model store.
+    Returns:
+        file_digest: Content hash identifying the stored file.
+    """
+    os.makedirs(os.path.join(store_dir, OBJECTS_DIR), exist_ok=True)
+
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    file_digest = h.hexdigest()
+
+    object_path = os.path.join(store_dir, OBJECTS_DIR, file_digest + ".bin")
+    if not os.path.exists(object_path):
+        _atomic_write(object_path, lambda p: shutil.copyfile(path, p))
+    return file_digest
+
+def get_model(model_digest, store_dir):
+    """
+    Rebuilds a model state_dict from the store.
+    Args:
+        model_digest: Content hash returned by put_model.
+        store_dir: Root directory of the model store.
+    Returns:
+        Model state_dict.
+    """
+    with open(os.path.join(store_dir, MODELS_DIR, model_digest + ".json")) as f:
+        layout = json.load(f)
+
+    state_dict = {}
+    for key, digest in layout:
+        state_dict[key] = torch.load(os.path.join(store_dir, OBJECTS_DIR, digest + ".pt"), map_location=torch.device('cpu'))
+    return state_dict
+
+def load_round_manifest(store_dir):
+    """
+    Loads the list of completed rounds recorded in the store.
+    Args:
+        store_dir: Root directory of the model store.
+    Returns:
+        List of round records, oldest first.
+    """
+    manifest_path = os.path.join(store_dir, ROUND_MANIFEST)
+    if not os.path.exists(manifest_path):
+        return []
+    with open(manifest_path) as f:
+        return json.load(f)
+
+def record_round(store_dir, rounds_remaining, global_model_digest, client_model_digests, server_state_digest=None):
+    """
+    Records a completed aggregation in the round manifest.
+    Args:
+        store_dir: Root directory of the model store.
+        rounds_remaining: Round counter of recursive_round.cwl (counts down to 1).
+        global_model_digest: Digest of the aggregated global model.
+        client_model_digests: Digests of the client models used for the aggregation.
+        server_state_digest: Digest of the server optimizer state after the round, if any.
+    """
+    rounds = load_round_manifest(store_dir)
+    rounds.append({
+        "rounds_remaining": rounds_remaining,
+        "global_model": global_model_digest,
+        "client_models": client_model_digests,
+        "server_state": server_state_digest,
+    })
+    _atomic_write(os.path.join(store_dir, ROUND_MANIFEST), lambda p: _write_text(p, json.dumps(rounds, indent=2)))
+
+def resume(store_dir, output_path, server_state_path="server_optimizer_state.pt"):
+    """
+    Restores the global model and server optimizer state of the last completed aggregation.
+    Args:
+        store_dir: Root directory of the model store.
+        output_path: Path to write the restored global model to.
+        server_state_path: Path to write the restored server optimizer state to (if one was recorded).
+    Returns:
+        (rounds_remaining, restored_server_state): number of rounds still to run and whether a
+        server optimizer state was restored, or None if no round was recorded.
+    """
+    rounds = load_round_manifest(store_dir)
+    if not rounds:
+        return None
+    last = rounds[-1]
+    torch.save(get_model(last["global_model"], store_dir), output_path)
+
+    server_state_digest = last.get("server_state")
+    if server_state_digest:
+        shutil.copyfile(os.path.join(store_dir, OBJECTS_DIR, server_state_digest + ".bin"), server_state_path)
+    return last["rounds_remaining"] - 1, bool(server_state_digest)
+
+def main(args):
+    if args.command == "put":
+        for model_file in args.models:
+            print(f"{put_model(torch.load(model_file, map_location=torch.device('cpu')), args.store_dir)}  {model_file}")
+    elif args.command == "get":
+        torch.save(get_model(args.digest, args.store_dir), args.output)
+    elif args.command == "resume":
+        restored = resume(args.store_dir, args.output, args.server_state_output)
+        if restored is None:
+            print(f"No completed rounds recorded in {args.store_dir}")
+        else:
+            remaining, restored_server_state = restored
+            print(f"Restored global model to {args.output}; rounds remaining: {remaining}")
+            if restored_server_state:
+                print(f"Restored server optimizer state to {args.server_state_output}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Content-addressed local model store")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    put_parser = subparsers.add_parser("put", help="Add model files to the store and print their digests")
+    put_parser.add_argument("--store_dir", type=str, required=True, help="Root directory of the model store")
+    put_parser.add_argument("--models", nargs='+', required=True, help="Model files to add")
+
+    get_parser = subparsers.add_parser("get", help="Materialize a stored model as a .pth file")
+    get_parser.add_argument("--store_dir", type=str, required=True, help="Root directory of the model store")
+    get_parser.add_argument("--digest", type=str, required=True, help="Digest of the model to restore")
+    get_parser.add_argument("--output", type=str, required=True, help="Path of the restored model file")
+
+    resume_parser = subparsers.add_parser("resume", help="Restore the global model of the last completed round")
+    resume_parser.add_argument("--store_dir", type=str, required=True, help="Root directory of the model store")
+    resume_parser.add_argument("--output", type=str, default="resumed_global_model.pth", help="Path of the restored global model")
+    resume_parser.add_argument("--server_state_output", type=str, default="server_optimizer_state.pt", help="Path of the restored server optimizer state")
+
+    main(parser.parse_args())
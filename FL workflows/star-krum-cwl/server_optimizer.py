@@ -0,0 +1,94 @@
+import torch
+import os
+from layout_plan import get_layout_plan, plan_signature
+
+SERVER_OPTIMIZERS = ("none", "momentum", "fedadam", "fedyogi")
+
+# Default server learning rates (Reddi et al., "Adaptive Federated Optimization")
+DEFAULT_SERVER_LR = {
+    "momentum": 1.0,
+    "fedadam": 0.01,
+    "fedyogi": 0.01,
+}
+
+def load_server_state(path, optimizer, signature):
+    """
+    Loads the server optimizer state sidecar written by a previous round.
+    Args:
+        path: Path of the sidecar file (may be None or missing on the first round).
+        optimizer: Name of the server optimizer in use.
+        signature: Architecture signature of the global model.
+    Returns:
+        State dict, or None if there is no usable state.
+    """
+    if not path or not os.path.exists(path):
+        return None
+    state = torch.load(path, map_location=torch.device('cpu'))
+    if state.get("optimizer") != optimizer or state.get("signature") != signature:
+        print(f"Ignoring server optimizer state in {path}: it was written for a different optimizer or model")
+        return None
+    return state
+
+def save_server_state(state, path):
+    """
+    Saves the server optimizer state sidecar for the next round.
+    """
+    torch.save(state, path)
+
+def server_update(global_model, aggregated_model, optimizer, state=None, server_lr=None,
+                  beta1=0.9, beta2=0.99, tau=1e-3):
+    """
+    Applies a server optimizer step, treating (aggregate - global) as a pseudo-gradient.
+    Only trainable entries are stepped; BatchNorm statistics and integer counters
+    are taken from the aggregate as is.
+    Args:
+        global_model: Global model state_dict before the round.
+        aggregated_model: Aggregated state_dict produced by the base strategy.
+        optimizer: One of "momentum", "fedadam" or "fedyogi".
+        state: Server optimizer state from the previous round, or None.
+        server_lr: Server learning rate (default depends on the optimizer).
+        beta1: Momentum / first moment decay.
+        beta2: Second moment decay (FedAdam, FedYogi).
+        tau: Adaptivity constant added to the second moment root (FedAdam, FedYogi).
+    Returns:
+        (new_global_model, new_state)
+    """
+    if optimizer not in DEFAULT_SERVER_LR:
+        raise ValueError(f"Unsupported server optimizer: {optimizer}")
+    if server_lr is None:
+        server_lr = DEFAULT_SERVER_LR[optimizer]
+
+    plan = get_layout_plan(global_model)
+    global_flat, _ = plan.flatten(global_model)
+    aggregated_flat, aggregated_counters = plan.flatten(aggregated_model)
+    mask = plan.trainable_mask
+
+    delta = (aggregated_flat - global_flat)[mask]
+    if state is None:
+        state = {
+            "optimizer": optimizer,
+            "signature": plan_signature(global_model),
+            "step": 0,
+            "m": torch.zeros_like(delta),
+            "v": torch.full_like(delta, tau * tau) if optimizer != "momentum" else None,
+        }
+
+    m = state["m"]
+    if optimizer == "momentum":
+        m.mul_(beta1).add_(delta)
+        step = m
+    else:
+        m.mul_(beta1).add_(delta, alpha=1 - beta1)
+        v = state["v"]
+        delta_sq = delta * delta
+        if optimizer == "fedadam":
+            v.mul_(beta2).add_(delta_sq, alpha=1 - beta2)
+        else:
+            v.sub_((1 - beta2) * delta_sq * torch.sign(v - delta_sq))
+        step = m / (v.sqrt() + tau)
+    state["step"] += 1
+
+    # Non-trainable float entries (BN statistics) follow the aggregate
+    new_flat = aggregated_flat.clone()
+    new_flat[mask] = global_flat[mask] + server_lr * step
+    return plan.unflatten(new_flat, aggregated_counters), state
@@ -3,6 +3,8 @@ from web3 import Web3
 import json
 import solcx
 import random
+import hashlib
+from merkle import leaf_hash, build_tree, merkle_root, merkle_proof
 
 # Connect to the local Ethereum network (Ganache)
 w3 = Web3(Web3.HTTPProvider("http://127.0.0.1:8545"))
@@ -86,13 +88,51 @@ def submit_job(client_address, job_result):
     except Exception as e:
         print(f"Error submitting job by client {client_address}: {str(e)}")
 
-# Validate all jobs, specifying success or failure for each client
-def validate_all_jobs(validator_address, successes):
+# Commit all client jobs of a round as one Merkle root (one transaction instead of K submitJob calls).
+# covered[i] marks whether registered client i has a leaf in the tree.
+def commit_jobs(validator_address, client_addresses, model_hashes, covered):
+    levels = build_tree([leaf_hash(address, model_hash) for address, model_hash in zip(client_addresses, model_hashes)])
+    root = merkle_root(levels)
     try:
-        tx_hash = deployed_contract.functions.validateAllJobs(successes).transact({'from': validator_address})
-        log_gas_usage(tx_hash, "Validating all jobs")
+        tx_hash = deployed_contract.functions.commitJobs(root, len(client_addresses), pack_bitmaps(covered)).transact({'from': validator_address})
+        log_gas_usage(tx_hash, f"Committing {len(client_addresses)} jobs")
     except Exception as e:
-        print(f"Error validating jobs by validator {validator_address}: {str(e)}")
+        print(f"Error committing jobs by validator {validator_address}: {str(e)}")
+    return levels
+
+# Challenge a client: check its inclusion proof against the committed root (read-only call)
+def verify_job(round_num, levels, index, client_address, model_hash):
+    try:
+        return deployed_contract.functions.verifyJob(round_num, client_address, model_hash, merkle_proof(levels, index)).call()
+    except Exception as e:
+        print(f"Error verifying job of client {client_address}: {str(e)}")
+        return False
+
+# Pack per-client flags (validation results, covered clients) into uint256 bitmaps: bit j of word j // 256 is client j
+def pack_bitmaps(flags):
+    bitmaps = [0] * ((len(flags) + 255) // 256)
+    for j, flag in enumerate(flags):
+        if flag:
+            bitmaps[j >> 8] |= 1 << (j & 255)
+    return bitmaps
+
+# Validate all jobs in bounded-size chunks, so a round never exceeds the block gas limit
+def validate_jobs_paginated(validator_address, successes, chunk_size=None):
+    if chunk_size is None:
+        chunk_size = deployed_contract.functions.MAX_VALIDATION_CHUNK().call()
+    gas_per_chunk = []
+    for start in range(0, len(successes), chunk_size):
+        chunk = successes[start:start + chunk_size]
+        try:
+            tx_hash = deployed_contract.functions.validateJobsChunk(start, len(chunk), pack_bitmaps(chunk)).transact({'from': validator_address})
+            receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+            gas_per_chunk.append(receipt.gasUsed)
+            print(f"Gas used for validating clients {start}-{start + len(chunk) - 1}: {receipt.gasUsed}")
+        except Exception as e:
+            print(f"Error validating chunk starting at client {start} by validator {validator_address}: {str(e)}")
+            break
+    print(f"Gas used for validating all jobs: {sum(gas_per_chunk)} in {len(gas_per_chunk)} chunk(s)")
+    return gas_per_chunk
 
 # Fetching updated reputations
 def get_reputation(client_address):
@@ -104,7 +144,7 @@ def get_reputation(client_address):
         print(f"Error fetching reputation for client {client_address}: {str(e)}")
 
 # Run the test with K clients and N rounds
-def run_test(K, N):
+def run_test(K, N, chunk_size=None, commitment=False):
     print(f"Running test with {K} clients and {N} rounds\n")
     
     # Add K clients with initialized parameters
@@ -131,21 +171,35 @@ def run_test(K, N):
     for round_num in range(1, N + 1):
         print(f"\n--- Round {round_num} ---")
         
-        # Each client submits a job
-        for i in range(1, K + 1):
-            submit_job(w3.eth.accounts[i], f"Job {round_num} from Client {i}")
-        
+        current_validator = deployed_contract.functions.getCurrentValidator().call()
+        print(f"Current Validator: {current_validator}")
+
+        if commitment:
+            # Model hashes are collected off-chain and committed as a single Merkle root.
+            # With real models use merkle.hash_model_file("client_trained_model.pth").
+            client_addresses = [w3.eth.accounts[i] for i in range(1, K + 1)]
+            model_hashes = [hashlib.sha256(f"Job {round_num} from Client {i}".encode()).digest() for i in range(1, K + 1)]
+            levels = commit_jobs(current_validator, client_addresses, model_hashes, [True] * K)
+
+            # Challenge one random client to prove inclusion
+            challenged = random.randrange(K)
+            committed_round = deployed_contract.functions.jobRound().call()
+            included = verify_job(committed_round, levels, challenged, client_addresses[challenged], model_hashes[challenged])
+            print(f"Inclusion proof of client {client_addresses[challenged]}: {'valid' if included else 'invalid'}")
+        else:
+            # Each client submits a job
+            for i in range(1, K + 1):
+                submit_job(w3.eth.accounts[i], f"Job {round_num} from Client {i}")
+
         # Randomly decide if each job is successful or not
         successes = [random.choice([True, False]) for _ in range(K)]
 
         # Validator validates all jobs
-        current_validator = deployed_contract.functions.getCurrentValidator().call()
-        print(f"Current Validator: {current_validator}")
-        validate_all_jobs(current_validator, successes)
+        validate_jobs_paginated(current_validator, successes, chunk_size)
         
         # Display the updated reputations
         for i in range(1, K + 1):
             get_reputation(w3.eth.accounts[i])
 
-# Example usage: Test with K clients over N rounds
+# Example usage: Test with K clients over N rounds (pass commitment=True for Merkle-batched job commitments)
 run_test(K=10, N=6)
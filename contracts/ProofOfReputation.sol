@@ -29,17 +29,36 @@ contract ProofOfReputation {
     // Penalty for failed validation
     uint256 public penalty = 10;  // 10 reputation points
 
+    // Paginated validation: maximum clients per chunk and progress of the current round
+    uint256 public constant MAX_VALIDATION_CHUNK = 512;
+    uint256 public constant VALIDATION_TIMEOUT_BLOCKS = 256;  // Blocks to wait for the next chunk before abortValidation
+    uint256 public validationCursor;       // Index of the next client to validate (0 when idle)
+    uint256 public validationDeadline;     // Block after which a stalled chunked validation can be aborted
+    uint256 private roundBestReputation;   // Highest reputation seen so far in the current round, validator excluded
+    uint256 private roundBestIndex;        // 1-based index of that client (0 when none)
+    mapping(address => uint256) private clientIndex;  // 1-based position in clientAddresses
+
+    // Merkle-batched job commitments: one root of (client, model hash) leaves per round
+    uint256 public jobRound;                   // Number of committed rounds
+    mapping(uint256 => bytes32) public jobRoots;
+    bool public jobsCommitted;                 // True while the committed round awaits validation
+    uint256[] private committedClients;        // Bitmap of client indices with a leaf in the committed root
+
     // Events for logging
     event ClientAdded(address client);
     event ValidatorSelected(address validator);
     event JobSubmitted(address client, string result);
+    event JobsCommitted(uint256 round, bytes32 root, uint256 jobCount);
     event JobValidated(address validator, address client, bool success);
     event ClientScoreUpdated(address client, uint256 newScore);
     event ValidatorRewarded(address validator, uint256 reward);
     event ValidatorPenalized(address validator, uint256 penalty);
+    event ValidationAborted(address validator, uint256 cursor);
 
     /**
      * @dev Add a new client with initialized parameters.
+     * Not allowed while a round is being validated or has committed jobs awaiting validation,
+     * since the committed bitmap and the validator are fixed for that round.
      */
     function addClient(
         address _client,
@@ -51,6 +70,8 @@ contract ProofOfReputation {
         uint256 _validationAccuracy
     ) public {
         require(clients[_client].reputationScore == 0, "Client already exists");
+        require(validationCursor == 0, "Validation in progress");
+        require(!jobsCommitted, "Jobs committed");
 
         clients[_client] = Client({
             reputationScore: _initialReputation,
@@ -64,12 +85,27 @@ contract ProofOfReputation {
         });
 
         clientAddresses.push(_client);
+        clientIndex[_client] = clientAddresses.length;
         totalReputation += _initialReputation;
 
         emit ClientAdded(_client);
         selectValidator();
     }
 
+    /**
+     * @dev Set the weights of the reputation factors; only allowed before any client is added.
+     */
+    function setWeights(uint256 _weightH, uint256 _weightT, uint256 _weightC, uint256 _weightP, uint256 _weightV) public {
+        require(clientAddresses.length == 0, "Weights are fixed once clients exist");
+        require(_weightH + _weightT + _weightC + _weightP + _weightV == 100, "Weights must sum to 100");
+
+        weightH = _weightH;
+        weightT = _weightT;
+        weightC = _weightC;
+        weightP = _weightP;
+        weightV = _weightV;
+    }
+
     /**
      * @dev Update the reputation score based on updated factors.
      */
@@ -103,30 +139,75 @@ contract ProofOfReputation {
         emit JobSubmitted(msg.sender, result);
     }
 
+    /**
+     * @dev Commit the jobs of all clients for a round as a single Merkle root.
+     * Leaves are keccak256(abi.encodePacked(client, modelHash)) and pairs are hashed in sorted order,
+     * so each client can prove inclusion with verifyJob. Only the clients marked in coveredBitmaps
+     * count as having submitted a job until the round is validated.
+     * @param root Merkle root of the round's job leaves.
+     * @param jobCount Number of leaves in the tree; must equal the number of covered clients.
+     * @param coveredBitmaps Bit i of coveredBitmaps[i / 256] is set if client i has a leaf in the root.
+     * @return The committed round number.
+     */
+    function commitJobs(bytes32 root, uint256 jobCount, uint256[] calldata coveredBitmaps) public returns (uint256) {
+        require(msg.sender == currentValidator, "Only the current validator can commit jobs");
+        require(!jobsCommitted, "Jobs already committed");
+        require(validationCursor == 0, "Validation in progress");
+        require(coveredBitmaps.length == (clientAddresses.length + 255) / 256, "Invalid bitmap length");
+
+        // Count the covered clients (one iteration per set bit) and check them against the tree size
+        uint256 covered = 0;
+        for (uint256 w = 0; w < coveredBitmaps.length; w++) {
+            for (uint256 word = coveredBitmaps[w]; word != 0; word &= word - 1) {
+                covered++;
+            }
+        }
+        require(covered == jobCount, "Job count does not match covered clients");
+        require(clientAddresses.length % 256 == 0 ||
+                coveredBitmaps[coveredBitmaps.length - 1] >> (clientAddresses.length % 256) == 0,
+                "Covered client out of range");
+
+        jobRound += 1;
+        jobRoots[jobRound] = root;
+        jobsCommitted = true;
+        committedClients = coveredBitmaps;
+
+        emit JobsCommitted(jobRound, root, jobCount);
+        return jobRound;
+    }
+
+    /**
+     * @dev Check a client's inclusion proof against a committed round.
+     * @param _round The committed round number.
+     * @param _client The address of the client.
+     * @param _modelHash Hash of the client's trained model.
+     * @param proof Sibling hashes from the leaf up to the root.
+     * @return True if the (client, model hash) leaf is part of the round's root.
+     */
+    function verifyJob(uint256 _round, address _client, bytes32 _modelHash, bytes32[] calldata proof) external view returns (bool) {
+        bytes32 node = keccak256(abi.encodePacked(_client, _modelHash));
+        for (uint256 i = 0; i < proof.length; i++) {
+            bytes32 sibling = proof[i];
+            node = node < sibling
+                ? keccak256(abi.encodePacked(node, sibling))
+                : keccak256(abi.encodePacked(sibling, node));
+        }
+        return node == jobRoots[_round];
+    }
+
     /**
      * @dev Function to validate all jobs by the current validator.
      */
     function validateAllJobs(bool[] memory successes) public {
         require(msg.sender == currentValidator, "Only the current validator can validate jobs");
         require(successes.length == clientAddresses.length, "Invalid input length");
+        require(validationCursor == 0, "Validation in progress");
 
         // Iterate through all clients and validate jobs
         for (uint256 i = 0; i < clientAddresses.length; i++) {
-            address clientAddr = clientAddresses[i];
-            if (clients[clientAddr].jobSubmitted) {
-                clients[clientAddr].jobSubmitted = false;
-
-                if (successes[i]) {
-                    // Update client factors based on job validation
-                    updateClientFactors(clientAddr);
-                    emit JobValidated(msg.sender, clientAddr, true);
-                } else {
-                    // Apply penalty if validation fails
-                    applyPenalty(clientAddr);
-                    emit JobValidated(msg.sender, clientAddr, false);
-                }
-            }
+            validateJob(i, successes[i]);
         }
+        jobsCommitted = false;
 
         // Reward the validator after successful validation
         rewardValidator();
@@ -135,6 +216,124 @@ contract ProofOfReputation {
         selectValidator();
     }
 
+    /**
+     * @dev Validate the jobs of clients [startIndex, startIndex + count) in one bounded transaction.
+     * Results are packed as bitmaps: bit j of successBitmaps[j / 256] is the result of client startIndex + j.
+     * Chunks must be submitted in order; the validator is rewarded and rotated after the last chunk.
+     * Until the last chunk arrives, addClient, commitJobs and validateAllJobs are blocked and only the
+     * current validator can continue; if it submits no chunk for VALIDATION_TIMEOUT_BLOCKS blocks,
+     * anyone can end the round with abortValidation.
+     * @param startIndex Index of the first client in this chunk; must equal validationCursor.
+     * @param count Number of clients in this chunk (at most MAX_VALIDATION_CHUNK).
+     * @param successBitmaps Packed validation results for this chunk.
+     */
+    function validateJobsChunk(uint256 startIndex, uint256 count, uint256[] calldata successBitmaps) public {
+        require(msg.sender == currentValidator, "Only the current validator can validate jobs");
+        require(startIndex == validationCursor, "Chunk out of order");
+        require(count > 0 && count <= MAX_VALIDATION_CHUNK, "Invalid chunk size");
+        require(startIndex + count <= clientAddresses.length, "Chunk out of range");
+        require(successBitmaps.length == (count + 255) / 256, "Invalid bitmap length");
+
+        if (startIndex == 0) {
+            roundBestReputation = 0;
+            roundBestIndex = 0;
+        }
+
+        uint256 bestReputation = roundBestReputation;
+        uint256 bestIndex = roundBestIndex;
+
+        for (uint256 j = 0; j < count; j++) {
+            uint256 i = startIndex + j;
+            address clientAddr = clientAddresses[i];
+            bool success = ((successBitmaps[j >> 8] >> (j & 255)) & 1) == 1;
+            validateJob(i, success);
+
+            // Track the highest reputation while walking the clients, so rotation needs no extra O(K) pass.
+            // The validator is compared separately after its reward, so it is left out here.
+            uint256 reputation = clients[clientAddr].reputationScore;
+            if (clientAddr != currentValidator && reputation > bestReputation) {
+                bestReputation = reputation;
+                bestIndex = i + 1;
+            }
+        }
+
+        if (startIndex + count < clientAddresses.length) {
+            validationCursor = startIndex + count;
+            validationDeadline = block.number + VALIDATION_TIMEOUT_BLOCKS;
+            roundBestReputation = bestReputation;
+            roundBestIndex = bestIndex;
+            return;
+        }
+
+        // Last chunk: reward the validator and rotate to the highest reputation
+        validationCursor = 0;
+        validationDeadline = 0;
+        jobsCommitted = false;
+        rewardValidator();
+
+        uint256 validatorReputation = clients[currentValidator].reputationScore;
+        uint256 validatorIndex = clientIndex[currentValidator];
+        if (validatorReputation > bestReputation || (validatorReputation == bestReputation && validatorIndex < bestIndex)) {
+            bestIndex = validatorIndex;
+        }
+
+        require(bestIndex != 0, "Validator selection failed");
+        setValidator(clientAddresses[bestIndex - 1]);
+    }
+
+    /**
+     * @dev End a chunked validation whose validator stopped submitting chunks; callable by anyone
+     * once validationDeadline has passed. Results of the chunks already submitted stand. Jobs that
+     * clients not yet reached submitted with submitJob stay pending for the next round, while the
+     * round's committed jobs are dropped. The stalled validator is penalized and the role goes to the
+     * highest reputation among the clients already validated in this round (it stays with the stalled
+     * validator only if none of them has a reputation).
+     */
+    function abortValidation() public {
+        require(validationCursor != 0, "No validation in progress");
+        require(block.number > validationDeadline, "Validation deadline not reached");
+
+        address stalledValidator = currentValidator;
+        emit ValidationAborted(stalledValidator, validationCursor);
+
+        validationCursor = 0;
+        validationDeadline = 0;
+        jobsCommitted = false;
+
+        applyPenalty(stalledValidator);
+        emit ValidatorPenalized(stalledValidator, penalty);
+
+        if (roundBestIndex != 0) {
+            setValidator(clientAddresses[roundBestIndex - 1]);
+        }
+    }
+
+    /**
+     * @dev Validate a single client's job, if one was submitted.
+     */
+    function validateJob(uint256 index, bool success) internal {
+        address clientAddr = clientAddresses[index];
+
+        // Committed jobs count only for covered clients that could have called submitJob
+        bool committed = jobsCommitted &&
+            ((committedClients[index >> 8] >> (index & 255)) & 1) == 1 &&
+            clients[clientAddr].reputationScore != 0;
+
+        if (clients[clientAddr].jobSubmitted || committed) {
+            clients[clientAddr].jobSubmitted = false;
+
+            if (success) {
+                // Update client factors based on job validation
+                updateClientFactors(clientAddr);
+                emit JobValidated(msg.sender, clientAddr, true);
+            } else {
+                // Apply penalty if validation fails
+                applyPenalty(clientAddr);
+                emit JobValidated(msg.sender, clientAddr, false);
+            }
+        }
+    }
+
     /**
      * @dev Apply a penalty to the client's reputation score on failed validation.
      */
@@ -195,13 +394,20 @@ contract ProofOfReputation {
 
         require(selectedValidator != address(0), "Validator selection failed");
 
-        currentValidator = selectedValidator;
+        setValidator(selectedValidator);
+    }
 
-        for (uint256 i = 0; i < clientAddresses.length; i++) {
-            clients[clientAddresses[i]].isValidator = (clientAddresses[i] == currentValidator);
+    /**
+     * @dev Internal function to hand the validator role over; only the old and new validator flags change.
+     */
+    function setValidator(address _validator) internal {
+        if (currentValidator != address(0)) {
+            clients[currentValidator].isValidator = false;
         }
+        currentValidator = _validator;
+        clients[_validator].isValidator = true;
 
-        emit ValidatorSelected(selectedValidator);
+        emit ValidatorSelected(_validator);
     }
 
     /**
@@ -0,0 +1,51 @@
+# Merkle trees of client job commitments, matching ProofOfReputation.commitJobs / verifyJob
+import hashlib
+from eth_utils import keccak, to_bytes, to_checksum_address
+
+# Hash of a trained model file (e.g. client_trained_model.pth), used as the leaf payload
+def hash_model_file(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.digest()
+
+# Leaf of a (client, model hash) pair: keccak256(abi.encodePacked(address, bytes32))
+def leaf_hash(client_address, model_hash):
+    return keccak(to_bytes(hexstr=to_checksum_address(client_address)) + model_hash)
+
+# Parent of two nodes, hashed in sorted order so proofs need no left/right flags
+def hash_pair(a, b):
+    return keccak(a + b) if a < b else keccak(b + a)
+
+# Build all tree levels from the leaves; an odd node is promoted to the next level unchanged
+def build_tree(leaves):
+    if not leaves:
+        raise ValueError("Cannot build a Merkle tree without leaves")
+    levels = [list(leaves)]
+    while len(levels[-1]) > 1:
+        level = levels[-1]
+        parents = [hash_pair(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            parents.append(level[-1])
+        levels.append(parents)
+    return levels
+
+def merkle_root(levels):
+    return levels[-1][0]
+
+# Sibling hashes from leaf `index` up to the root
+def merkle_proof(levels, index):
+    proof = []
+    for level in levels[:-1]:
+        sibling = index ^ 1
+        if sibling < len(level):
+            proof.append(level[sibling])
+        index //= 2
+    return proof
+
+def verify_proof(leaf, proof, root):
+    node = leaf
+    for sibling in proof:
+        node = hash_pair(node, sibling)
+    return node == root
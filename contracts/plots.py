@@ -3,65 +3,80 @@ from web3 import Web3
 import json
 import solcx
 import random
+import argparse
 import matplotlib.pyplot as plt
 
-# Connect to the local Ethereum network (Ganache)
-w3 = Web3(Web3.HTTPProvider("http://127.0.0.1:8545"))
-
-# Check if connection is successful
-if not w3.is_connected():
-    raise Exception("Failed to connect to the Ethereum network")
-
-# Set the default account (deployer)
-w3.eth.default_account = w3.eth.accounts[0]
-
-# Compile the contract using solcx
-solcx.install_solc('0.8.0')
-solcx.set_solc_version('0.8.0')
-
-# Path to your Solidity contract
-contract_path = "./ProofOfReputation.sol"  # Update this path to your contract
-
-# Compile the Solidity contract
-with open(contract_path, "r") as file:
-    contract_source_code = file.read()
-
-compiled_sol = solcx.compile_standard({
-    "language": "Solidity",
-    "sources": {
-        "ProofOfReputation.sol": {
-            "content": contract_source_code
-        }
-    },
-    "settings": {
-        "outputSelection": {
-            "*": {
-                "*": ["abi", "metadata", "evm.bytecode", "evm.sourceMap"]
+# Plot a finished sweep.py configuration instead of running against Ganache:
+#   python plots.py --results sweep_results.parquet --config_id 3
+parser = argparse.ArgumentParser()
+parser.add_argument("--results", type=str, default=None, help="sweep.py results file to plot instead of running the test")
+parser.add_argument("--config_id", type=int, default=0, help="Configuration of the sweep to plot")
+args = parser.parse_args()
+
+if args.results:
+    from sweep_results import load_sweep_histories
+    histories = load_sweep_histories(args.results, args.config_id)
+    reputation_history = histories["reputation_history"]
+    success_history = histories["success_history"]
+    failure_history = histories["failure_history"]
+else:
+    # Connect to the local Ethereum network (Ganache)
+    w3 = Web3(Web3.HTTPProvider("http://127.0.0.1:8545"))
+
+    # Check if connection is successful
+    if not w3.is_connected():
+        raise Exception("Failed to connect to the Ethereum network")
+
+    # Set the default account (deployer)
+    w3.eth.default_account = w3.eth.accounts[0]
+
+    # Compile the contract using solcx
+    solcx.install_solc('0.8.0')
+    solcx.set_solc_version('0.8.0')
+
+    # Path to your Solidity contract
+    contract_path = "./ProofOfReputation.sol"  # Update this path to your contract
+
+    # Compile the Solidity contract
+    with open(contract_path, "r") as file:
+        contract_source_code = file.read()
+
+    compiled_sol = solcx.compile_standard({
+        "language": "Solidity",
+        "sources": {
+            "ProofOfReputation.sol": {
+                "content": contract_source_code
+            }
+        },
+        "settings": {
+            "outputSelection": {
+                "*": {
+                    "*": ["abi", "metadata", "evm.bytecode", "evm.sourceMap"]
+                }
             }
         }
-    }
-})
+    })
 
-# Extract ABI and bytecode
-abi = compiled_sol['contracts']['ProofOfReputation.sol']['ProofOfReputation']['abi']
-bytecode = compiled_sol['contracts']['ProofOfReputation.sol']['ProofOfReputation']['evm']['bytecode']['object']
+    # Extract ABI and bytecode
+    abi = compiled_sol['contracts']['ProofOfReputation.sol']['ProofOfReputation']['abi']
+    bytecode = compiled_sol['contracts']['ProofOfReputation.sol']['ProofOfReputation']['evm']['bytecode']['object']
 
-# Deploy the contract
-ProofOfReputation = w3.eth.contract(abi=abi, bytecode=bytecode)
+    # Deploy the contract
+    ProofOfReputation = w3.eth.contract(abi=abi, bytecode=bytecode)
 
-# Deploy the contract and get the transaction hash
-tx_hash = ProofOfReputation.constructor().transact()
-tx_receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
-contract_address = tx_receipt.contractAddress
-print(f"Contract deployed at address: {contract_address}")
+    # Deploy the contract and get the transaction hash
+    tx_hash = ProofOfReputation.constructor().transact()
+    tx_receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+    contract_address = tx_receipt.contractAddress
+    print(f"Contract deployed at address: {contract_address}")
 
-# Get the deployed contract instance
-deployed_contract = w3.eth.contract(address=contract_address, abi=abi)
+    # Get the deployed contract instance
+    deployed_contract = w3.eth.contract(address=contract_address, abi=abi)
 
-# Initialize data storage
-reputation_history = {address: [] for address in w3.eth.accounts}  # Adjust for the number of clients
-success_history = []
-failure_history = []
+    # Initialize data storage
+    reputation_history = {address: [] for address in w3.eth.accounts}  # Adjust for the number of clients
+    success_history = []
+    failure_history = []
 
 # Function to log gas used
 def log_gas_usage(tx_hash, action):
@@ -162,7 +177,8 @@ def run_test(K, N):
             reputation_history[accounts[i]].append(reputation)
 
 # Example usage: Test with 5 clients over 10 rounds
-run_test(K=5, N=100)
+if not args.results:
+    run_test(K=5, N=100)
 
 # Plot the results
 def plot_results():
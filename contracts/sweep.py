@@ -0,0 +1,189 @@
+# Parallel experiment sweep for the ProofOfReputation contract.
+# Every (K, N, seed, weights) configuration runs in its own worker process against an
+# isolated in-process EVM (eth-tester + py-evm), so no shared Ganache is needed, and
+# results are streamed into one columnar Parquet file for the plotting scripts
+# (python plots.py --results sweep_results.parquet --config_id <id>).
+import argparse
+import itertools
+import multiprocessing
+import random
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import solcx
+from eth_tester import EthereumTester, PyEVMBackend
+from web3 import Web3
+
+DEFAULT_WEIGHTS = (15, 25, 20, 20, 20)
+
+# One row per (configuration, round, client)
+RESULT_SCHEMA = pa.schema([
+    ("config_id", pa.int32()),
+    ("K", pa.int32()),
+    ("N", pa.int32()),
+    ("seed", pa.int64()),
+    ("weightH", pa.int32()),
+    ("weightT", pa.int32()),
+    ("weightC", pa.int32()),
+    ("weightP", pa.int32()),
+    ("weightV", pa.int32()),
+    ("round", pa.int32()),
+    ("client", pa.int32()),
+    ("address", pa.string()),
+    ("reputation", pa.int64()),
+    ("success", pa.bool_()),
+    ("is_validator", pa.bool_()),
+    ("round_successes", pa.int32()),
+    ("round_failures", pa.int32()),
+    ("gas_submit", pa.int64()),
+    ("gas_validate", pa.int64()),
+])
+
+# Compile the contract once in the parent process
+def compile_contract(contract_path="./ProofOfReputation.sol"):
+    solcx.install_solc('0.8.0')
+    solcx.set_solc_version('0.8.0')
+
+    with open(contract_path, "r") as file:
+        contract_source_code = file.read()
+
+    compiled_sol = solcx.compile_standard({
+        "language": "Solidity",
+        "sources": {
+            "ProofOfReputation.sol": {
+                "content": contract_source_code
+            }
+        },
+        "settings": {
+            "outputSelection": {
+                "*": {
+                    "*": ["abi", "evm.bytecode"]
+                }
+            }
+        }
+    })
+
+    contract = compiled_sol['contracts']['ProofOfReputation.sol']['ProofOfReputation']
+    return contract['abi'], contract['evm']['bytecode']['object']
+
+# Pack validation results into uint256 bitmaps: bit j of word j // 256 is the result of client j
+def pack_bitmaps(successes):
+    bitmaps = [0] * ((len(successes) + 255) // 256)
+    for j, success in enumerate(successes):
+        if success:
+            bitmaps[j >> 8] |= 1 << (j & 255)
+    return bitmaps
+
+_abi = None
+_bytecode = None
+
+def _init_worker(abi, bytecode):
+    global _abi, _bytecode
+    _abi = abi
+    _bytecode = bytecode
+
+# Run one configuration on a fresh in-process EVM and return its rows as columns
+def run_config(config):
+    config_id, K, N, seed, weights = config
+    rng = random.Random(seed)
+
+    # Isolated chain with one deployer account plus K client accounts
+    genesis_state = PyEVMBackend.generate_genesis_state(num_accounts=K + 1)
+    w3 = Web3(Web3.EthereumTesterProvider(EthereumTester(PyEVMBackend(genesis_state=genesis_state))))
+    accounts = w3.eth.accounts
+    w3.eth.default_account = accounts[0]
+
+    tx_hash = w3.eth.contract(abi=_abi, bytecode=_bytecode).constructor().transact()
+    contract = w3.eth.contract(address=w3.eth.wait_for_transaction_receipt(tx_hash).contractAddress, abi=_abi)
+    contract.functions.setWeights(*weights).transact()
+    chunk_size = contract.functions.MAX_VALIDATION_CHUNK().call()
+
+    # Add K clients with initialized parameters
+    clients = accounts[1:K + 1]
+    for client in clients:
+        contract.functions.addClient(
+            client,
+            rng.randint(50, 100),
+            rng.randint(0, 10),
+            rng.randint(0, 10),
+            rng.randint(0, 10),
+            rng.randint(0, 10),
+            rng.randint(0, 10)
+        ).transact()
+
+    columns = {field.name: [] for field in RESULT_SCHEMA}
+    for round_num in range(1, N + 1):
+        # Each client submits a job
+        gas_submit = 0
+        for i, client in enumerate(clients):
+            tx_hash = contract.functions.submitJob(f"Job {round_num} from Client {i + 1}").transact({'from': client})
+            gas_submit += w3.eth.get_transaction_receipt(tx_hash).gasUsed
+
+        # Randomly decide if each job is successful or not
+        successes = [rng.choice([True, False]) for _ in range(K)]
+
+        # Validator validates all jobs in bounded-size chunks
+        validator = contract.functions.getCurrentValidator().call()
+        gas_validate = 0
+        for start in range(0, K, chunk_size):
+            chunk = successes[start:start + chunk_size]
+            tx_hash = contract.functions.validateJobsChunk(start, len(chunk), pack_bitmaps(chunk)).transact({'from': validator})
+            gas_validate += w3.eth.get_transaction_receipt(tx_hash).gasUsed
+
+        success_count = sum(successes)
+        for i, client in enumerate(clients):
+            columns["config_id"].append(config_id)
+            columns["K"].append(K)
+            columns["N"].append(N)
+            columns["seed"].append(seed)
+            for name, weight in zip(("weightH", "weightT", "weightC", "weightP", "weightV"), weights):
+                columns[name].append(weight)
+            columns["round"].append(round_num)
+            columns["client"].append(i + 1)
+            columns["address"].append(client)
+            columns["reputation"].append(contract.functions.getReputationScore(client).call())
+            columns["success"].append(successes[i])
+            columns["is_validator"].append(client == validator)
+            columns["round_successes"].append(success_count)
+            columns["round_failures"].append(K - success_count)
+            columns["gas_submit"].append(gas_submit)
+            columns["gas_validate"].append(gas_validate)
+
+    return config_id, columns
+
+def build_grid(Ks, Ns, seeds, weight_sets):
+    return [(config_id, K, N, seed, weights)
+            for config_id, (K, N, seed, weights) in enumerate(itertools.product(Ks, Ns, seeds, weight_sets))]
+
+def parse_weights(value):
+    weights = tuple(int(w) for w in value.split(","))
+    if len(weights) != 5 or sum(weights) != 100:
+        raise argparse.ArgumentTypeError("weights must be five comma-separated integers summing to 100 (H,T,C,P,V)")
+    return weights
+
+# Run the grid across worker processes, writing each finished configuration as one row group
+def run_sweep(grid, output, workers=None, contract_path="./ProofOfReputation.sol"):
+    abi, bytecode = compile_contract(contract_path)
+
+    with multiprocessing.Pool(processes=workers, initializer=_init_worker, initargs=(abi, bytecode)) as pool, \
+            pq.ParquetWriter(output, RESULT_SCHEMA) as writer:
+        for done, (config_id, columns) in enumerate(pool.imap_unordered(run_config, grid), start=1):
+            writer.write_table(pa.Table.from_pydict(columns, schema=RESULT_SCHEMA))
+            _, K, N, seed, weights = grid[config_id]
+            print(f"[{done}/{len(grid)}] K={K} N={N} seed={seed} weights={weights} done")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a grid of reputation contract experiments in parallel")
+    parser.add_argument("--K", nargs='+', type=int, default=[5, 10], help="Numbers of clients")
+    parser.add_argument("--N", nargs='+', type=int, default=[10], help="Numbers of rounds")
+    parser.add_argument("--seeds", nargs='+', type=int, default=[0], help="Random seeds")
+    parser.add_argument("--weights", nargs='+', type=parse_weights, default=[DEFAULT_WEIGHTS],
+                        help="Reputation weight sets as H,T,C,P,V (e.g. 15,25,20,20,20)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: number of cores)")
+    parser.add_argument("--output", type=str, default="sweep_results.parquet", help="Columnar results file")
+    parser.add_argument("--contract", type=str, default="./ProofOfReputation.sol", help="Path to the Solidity contract")
+    args = parser.parse_args()
+
+    grid = build_grid(args.K, args.N, args.seeds, args.weights)
+    print(f"Running {len(grid)} configurations")
+    run_sweep(grid, args.output, args.workers, args.contract)
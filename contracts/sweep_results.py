@@ -0,0 +1,41 @@
+# Load one configuration of a sweep.py results file into the histories used by plots.py / plots1.py
+from collections import defaultdict
+
+import pyarrow.parquet as pq
+
+def load_sweep_histories(path, config_id):
+    rows = pq.read_table(path, filters=[("config_id", "=", config_id)]).to_pylist()
+    if not rows:
+        raise ValueError(f"No results for config_id {config_id} in {path}")
+    rows.sort(key=lambda row: (row["round"], row["client"]))
+
+    histories = {
+        "reputation_history": defaultdict(list),
+        "success_history": [],
+        "failure_history": [],
+        "submission_success_counts": defaultdict(int),
+        "submission_failure_counts": defaultdict(int),
+        "validation_success_counts": defaultdict(int),
+        "validation_failure_counts": defaultdict(int),
+    }
+
+    for round_num in sorted({row["round"] for row in rows}):
+        round_rows = [row for row in rows if row["round"] == round_num]
+        histories["success_history"].append(round_rows[0]["round_successes"])
+        histories["failure_history"].append(round_rows[0]["round_failures"])
+        validator = next((row["address"] for row in round_rows if row["is_validator"]), None)
+
+        for row in round_rows:
+            histories["reputation_history"][row["address"]].append(row["reputation"])
+            # Every job in a sweep is submitted; failed submissions abort the configuration
+            histories["submission_success_counts"][row["address"]] += 1
+            if validator is not None:
+                if row["success"]:
+                    histories["validation_success_counts"][validator] += 1
+                else:
+                    histories["validation_failure_counts"][validator] += 1
+
+    config = rows[0]
+    print(f"Loaded config {config_id} from {path}: K={config['K']} N={config['N']} seed={config['seed']} "
+          f"weights=({config['weightH']}, {config['weightT']}, {config['weightC']}, {config['weightP']}, {config['weightV']})")
+    return histories